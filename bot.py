@@ -3,6 +3,8 @@ import os
 import textwrap
 from typing import Optional
 import ast
+import codecs
+import re
 
 
 
@@ -11,13 +13,29 @@ from nextcord.ui import View, Button
 from nextcord.ext import commands
 from dotenv import load_dotenv
 
-from sandbox import run_code_in_docker, SandboxError, ensure_image, build_pip_install_command
+from sandbox import (
+    run_code_in_docker_async,
+    SandboxError,
+    ContainerNotRunning,
+    ensure_image,
+    build_pip_install_command,
+    start_sandbox_container,
+    remove_container,
+    remove_labelled_containers,
+)
 import json
 import asyncio
 import shlex
+import shutil
 import time
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,30 +47,31 @@ DEFAULT_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "25.0"))
 SANDBOX_IMAGE = os.getenv("SANDBOX_IMAGE", "python:3.11-alpine")
 PULL_ON_STARTUP = os.getenv("SANDBOX_PULL_ON_STARTUP", "1") not in {"0", "false", "False"}
 ECHO_LAST_EXPR = os.getenv("ECHO_LAST_EXPR", "1") not in {"0", "false", "False"}
+ECHO_MAX_CODE_CHARS = 8_000
 IL_BASE_DIR = Path(os.getenv("IL_BASE_DIR", "./il_sandboxes")).resolve()
 IL_TIMEOUT_SECONDS = float(os.getenv("IL_TIMEOUT_SECONDS", "30.0"))
 IL_MEMORY = os.getenv("IL_MEMORY", "256m")
 IL_CPUS = os.getenv("IL_CPUS", "1.0")
+IL_MAX_CODE_CHARS = int(os.getenv("IL_MAX_CODE_CHARS", "64000"))
 IL_RETENTION_SECONDS = int(os.getenv("IL_RETENTION_SECONDS", str(7 * 24 * 3600)))
+IL_CONTAINER_IDLE_SECONDS = float(os.getenv("IL_CONTAINER_IDLE_SECONDS", "600"))
 
 
 intents = nextcord.Intents.default()
 bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
 
 
+# ```python\n...``` (optional language hint) or inline `...`
+_CODEBLOCK_RE = re.compile(r"\A```(?:(?:python|py)\n)?(.*?)```\Z|\A`(.*?)`\Z", re.DOTALL)
+
+
 def extract_code_block(raw: str) -> str:
     content = raw.strip()
-    # Handle inline single-backtick code like `1+1`
-    if content.startswith("`") and content.endswith("`") and len(content) >= 2:
-        inner_inline = content[1:-1]
-        return inner_inline.strip()
-    if content.startswith("```") and content.endswith("```"):
-        # strip triple backticks and optional language hint
-        inner = content[3:-3]
-        if inner.startswith("python\n") or inner.startswith("py\n"):
-            inner = inner.split("\n", 1)[1] if "\n" in inner else ""
-        return inner.strip()
-    return content
+    m = _CODEBLOCK_RE.match(content)
+    if not m:
+        return content
+    inner = m.group(1) if m.group(1) is not None else m.group(2)
+    return inner.strip()
 
 
 def format_result(stdout: str, stderr: str, returncode: int, truncated: bool) -> str:
@@ -73,6 +92,12 @@ def format_result(stdout: str, stderr: str, returncode: int, truncated: bool) ->
     return text
 
 
+# Last lines that start a statement can never end a top-level expression
+_STATEMENT_LINE_RE = re.compile(
+    r"\s*(?:async\s+def|def|class|return|import|from|pass|raise|del|global|nonlocal|assert|break|continue)\b"
+)
+
+
 def maybe_echo_last_expr(code: str) -> str:
     """If enabled, append a print of the last expression's source.
 
@@ -81,6 +106,21 @@ def maybe_echo_last_expr(code: str) -> str:
     """
     if not ECHO_LAST_EXPR:
         return code
+    last_line = next((line for line in reversed(code.splitlines()) if line.strip()), "")
+    if not last_line or _STATEMENT_LINE_RE.match(last_line):
+        return code
+    # Fast path for one-liners like `1+1`: compiling the line as an expression
+    # is enough, no tree needed. Skipped when a comment could swallow the parens.
+    src = last_line.strip()
+    if src == code.strip() and "#" not in src:
+        try:
+            compile(src, "<last>", "eval")
+        except SyntaxError:
+            pass
+        else:
+            if src.startswith("print("):
+                return code
+            return f"{code}\nprint(repr(({src})))"
     try:
         tree = ast.parse(code, mode="exec")
     except Exception:
@@ -91,41 +131,9 @@ def maybe_echo_last_expr(code: str) -> str:
     if isinstance(last, ast.Expr):
         expr = last.value
         # Avoid echoing if the last expression is an explicit print(...) call
-        try:
-            if isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == "print":
-                return code
-        except Exception:
-            pass
-        # Try to recover the exact source of the last expression
-        src = ast.get_source_segment(code, expr)
-        if not src:
-            # Fallback using node positions (Python 3.8+)
-            try:
-                lines = code.splitlines()
-                start = getattr(expr, "lineno", None)
-                end = getattr(expr, "end_lineno", None)
-                scol = getattr(expr, "col_offset", 0)
-                ecol = getattr(expr, "end_col_offset", None)
-                if start is not None and end is not None:
-                    if start == end:
-                        seg = lines[start - 1][scol:ecol]
-                    else:
-                        parts = [lines[start - 1][scol:]]
-                        for i in range(start, end - 1):
-                            parts.append(lines[i])
-                        parts.append(lines[end - 1][:ecol])
-                        seg = "\n".join(parts)
-                    src = seg.strip()
-            except Exception:
-                src = None
-        if not src:
-            # Final fallback: last non-empty line
-            for line in reversed(code.splitlines()):
-                if line.strip():
-                    src = line.strip()
-                    break
-        if src:
-            return f"{code}\nprint(repr(({src})))"
+        if isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == "print":
+            return code
+        return f"{code}\nprint(repr(({ast.unparse(expr)})))"
     return code
 
 
@@ -139,27 +147,50 @@ def _meta_path(user_id: int) -> Path:
     return _user_dir(user_id) / ".meta.json"
 
 
+# user id -> (meta file mtime_ns, parsed meta); revalidated with a stat on read
+_META_CACHE: dict[int, tuple[int, dict]] = {}
+
+
 def _load_meta(user_id: int) -> Optional[dict]:
+    path = _meta_path(user_id)
+    try:
+        st = os.stat(path)
+    except OSError:
+        _META_CACHE.pop(user_id, None)
+        return None
+    cached = _META_CACHE.get(user_id)
+    if cached and cached[0] == st.st_mtime_ns:
+        return cached[1]
     try:
-        with open(_meta_path(user_id), "r", encoding="utf-8") as f:
-            return json.load(f)
+        data = path.read_bytes()
+        meta = orjson.loads(data) if orjson else json.loads(data)
     except Exception:
         return None
+    _META_CACHE[user_id] = (st.st_mtime_ns, meta)
+    return meta
 
 
 def _save_meta(user_id: int, meta: dict) -> None:
     d = _user_dir(user_id)
     d.mkdir(parents=True, exist_ok=True)
     p = _meta_path(user_id)
-    with open(p, "w", encoding="utf-8") as f:
-        json.dump(meta, f)
+    p.write_bytes(orjson.dumps(meta) if orjson else json.dumps(meta).encode("utf-8"))
+    _META_CACHE[user_id] = (os.stat(p).st_mtime_ns, meta)
 
 
 def _now() -> float:
     return time.time()
 
 
+# user id -> time the sandbox was last confirmed on disk; skips re-checking
+# back-to-back commands from the same user
+_SANDBOX_OK: dict[int, float] = {}
+_SANDBOX_OK_TTL = 5.0
+
+
 def _ensure_sandbox(user_id: int) -> bool:
+    if _now() - _SANDBOX_OK.get(user_id, 0.0) < _SANDBOX_OK_TTL:
+        return True
     d = _user_dir(user_id)
     if not d.exists():
         return False
@@ -170,17 +201,10 @@ def _ensure_sandbox(user_id: int) -> bool:
     last = float(meta.get("last_used", meta.get("created_at", 0)))
     if _now() - last > IL_RETENTION_SECONDS:
         # Expired; delete
-        try:
-            for p in sorted(d.rglob("*"), reverse=True):
-                if p.is_file() or p.is_symlink():
-                    p.unlink(missing_ok=True)
-            for p in sorted(d.rglob("*"), reverse=True):
-                if p.is_dir():
-                    p.rmdir()
-            d.rmdir()
-        except Exception:
-            pass
+        _META_CACHE.pop(user_id, None)
+        shutil.rmtree(d, ignore_errors=True)
         return False
+    _SANDBOX_OK[user_id] = _now()
     return True
 
 
@@ -202,14 +226,10 @@ def _delete_sandbox(user_id: int) -> bool:
     d = _user_dir(user_id)
     if not d.exists():
         return False
+    _SANDBOX_OK.pop(user_id, None)
+    _META_CACHE.pop(user_id, None)
     try:
-        for p in sorted(d.rglob("*"), reverse=True):
-            if p.is_file() or p.is_symlink():
-                p.unlink(missing_ok=True)
-        for p in sorted(d.rglob("*"), reverse=True):
-            if p.is_dir():
-                p.rmdir()
-        d.rmdir()
+        shutil.rmtree(d)
         return True
     except Exception:
         return False
@@ -265,8 +285,93 @@ def _resolve_path(user_id: int, rel: str) -> Optional[Path]:
     return p
 
 
+# --- Long-lived per-user containers ---
+
+# user id -> last time code ran in the user's container; presence means "running"
+_CONTAINER_LAST_USED: dict[int, float] = {}
+# user id -> number of runs currently executing in the container; never reaped
+_CONTAINER_RUNS: dict[int, int] = {}
+# user id -> lock serializing container start/stop for that user
+_CONTAINER_LOCKS: dict[int, asyncio.Lock] = {}
+_pull_task: Optional[asyncio.Task] = None
+_reaper_task: Optional[asyncio.Task] = None
+
+
+def _container_name(user_id: int) -> str:
+    return f"il-{user_id}"
+
+
+def _start_container(user_id: int) -> None:
+    cid = start_sandbox_container(
+        _container_name(user_id),
+        mount_dir=str(_user_dir(user_id)),
+        memory=IL_MEMORY,
+        cpus=IL_CPUS,
+        image=SANDBOX_IMAGE,
+    )
+    _CONTAINER_LAST_USED[user_id] = _now()
+    meta = _load_meta(user_id)
+    if meta is not None and meta.get("container_id") != cid:
+        meta["container_id"] = cid
+        _save_meta(user_id, meta)
+
+
+def _stop_container(user_id: int) -> None:
+    _CONTAINER_LAST_USED.pop(user_id, None)
+    remove_container(_container_name(user_id))
+
+
+async def _ensure_container(user_id: int) -> None:
+    # Concurrent commands from one user must not both `docker run` the same name
+    async with _CONTAINER_LOCKS.setdefault(user_id, asyncio.Lock()):
+        if user_id not in _CONTAINER_LAST_USED:
+            await asyncio.to_thread(_start_container, user_id)
+
+
+async def _release_container(user_id: int, *, idle_only: bool = False) -> None:
+    async with _CONTAINER_LOCKS.setdefault(user_id, asyncio.Lock()):
+        if idle_only:
+            last = _CONTAINER_LAST_USED.get(user_id)
+            if last is None or _CONTAINER_RUNS.get(user_id) or last >= _now() - IL_CONTAINER_IDLE_SECONDS:
+                return
+        await asyncio.to_thread(_stop_container, user_id)
+
+
+@contextmanager
+def _container_in_use(user_id: int):
+    _CONTAINER_LAST_USED[user_id] = _now()
+    _CONTAINER_RUNS[user_id] = _CONTAINER_RUNS.get(user_id, 0) + 1
+    try:
+        yield
+    finally:
+        _CONTAINER_RUNS[user_id] -= 1
+        if not _CONTAINER_RUNS[user_id]:
+            del _CONTAINER_RUNS[user_id]
+
+
+async def _reap_idle_containers():
+    # Containers left by a previous process are not tracked; drop them up front
+    await asyncio.to_thread(remove_labelled_containers)
+    while True:
+        await asyncio.sleep(60)
+        cutoff = _now() - IL_CONTAINER_IDLE_SECONDS
+        for uid, last in list(_CONTAINER_LAST_USED.items()):
+            if last < cutoff and not _CONTAINER_RUNS.get(uid):
+                # Re-checked under the user's lock in case a run just started
+                await _release_container(uid, idle_only=True)
+
+
+async def _pull_image():
+    try:
+        await asyncio.to_thread(ensure_image, SANDBOX_IMAGE, pull=True)
+        print(f"Docker image ready: {SANDBOX_IMAGE}")
+    except SandboxError as e:
+        print(f"[WARN] Unable to ensure Docker image '{SANDBOX_IMAGE}': {e}")
+
+
 @bot.event
 async def on_ready():
+    global _pull_task, _reaper_task
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
     print("------")
     print(
@@ -275,12 +380,12 @@ async def on_ready():
         f"PULL_ON_STARTUP={PULL_ON_STARTUP}, "
         f"SANDBOX_IMAGE={SANDBOX_IMAGE}"
     )
-    if PULL_ON_STARTUP:
-        try:
-            ensure_image(SANDBOX_IMAGE, pull=True)
-            print(f"Docker image ready: {SANDBOX_IMAGE}")
-        except SandboxError as e:
-            print(f"[WARN] Unable to ensure Docker image '{SANDBOX_IMAGE}': {e}")
+    # on_ready fires again on reconnect; start the background work only once.
+    # Pulling can take minutes, so it must not hold up the event loop.
+    if PULL_ON_STARTUP and _pull_task is None:
+        _pull_task = asyncio.create_task(_pull_image())
+    if _reaper_task is None:
+        _reaper_task = asyncio.create_task(_reap_idle_containers())
 
 
 @bot.slash_command(name="il", description="Interact with your personal sandbox.")
@@ -291,10 +396,15 @@ async def il(inter: nextcord.Interaction):
 async def il_create(inter: nextcord.Interaction):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if _ensure_sandbox(uid):
+    if await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("You already have a sandbox.")
         return
-    if _create_sandbox(uid):
+    if await asyncio.to_thread(_create_sandbox, uid):
+        try:
+            await _ensure_container(uid)
+        except SandboxError as e:
+            # Not fatal: /il py starts the container lazily
+            print(f"[WARN] Unable to start container for {uid}: {e}")
         await inter.followup.send("Sandbox created. Use /il look to browse and /il py to run code.")
     else:
         await inter.followup.send("Failed to create sandbox. Try again.")
@@ -304,27 +414,45 @@ async def il_create(inter: nextcord.Interaction):
 async def il_py(inter: nextcord.Interaction, code: str):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox found or it expired. Use /il create first.")
         return
     code_to_run = extract_code_block(code)
-    to_exec = maybe_echo_last_expr(code_to_run)
+    if len(code_to_run) > IL_MAX_CODE_CHARS:
+        await inter.followup.send(f"Code too large (max {IL_MAX_CODE_CHARS} characters).")
+        return
+    # REPL-style echo only pays off for short snippets; skip parsing big ones
+    to_exec = maybe_echo_last_expr(code_to_run) if len(code_to_run) <= ECHO_MAX_CODE_CHARS else code_to_run
+    cwd = await asyncio.to_thread(_get_cwd, uid)
     try:
-        res = run_code_in_docker(
-            to_exec,
-            timeout_seconds=IL_TIMEOUT_SECONDS,
-            image=SANDBOX_IMAGE,
-            ensure_image_present=not PULL_ON_STARTUP,
-            memory=IL_MEMORY,
-            cpus=IL_CPUS,
-            mount_dir=str(_user_dir(uid)),
-            workdir_subpath=_get_cwd(uid),
-            env={"PYTHONPATH": "/workspace/.site-packages"},
-        )
+        if not PULL_ON_STARTUP:
+            await asyncio.to_thread(ensure_image, SANDBOX_IMAGE, pull=True)
+        for attempt in range(2):
+            await _ensure_container(uid)
+            try:
+                with _container_in_use(uid):
+                    res = await run_code_in_docker_async(
+                        to_exec,
+                        timeout_seconds=IL_TIMEOUT_SECONDS,
+                        workdir_subpath=cwd,
+                        env={"PYTHONPATH": "/workspace/.site-packages"},
+                        container_name=_container_name(uid),
+                    )
+                break
+            except ContainerNotRunning:
+                # Container died or was removed behind our back; restart once
+                _CONTAINER_LAST_USED.pop(uid, None)
+                if attempt:
+                    raise
     except SandboxError as e:
         await inter.followup.send(f"Sandbox error: {e}")
         return
-    _update_last_used(uid)
+    if res.timed_out or res.truncated:
+        # The runner removed the container to stop the code
+        _CONTAINER_LAST_USED.pop(uid, None)
+    else:
+        _CONTAINER_LAST_USED[uid] = _now()
+    await asyncio.to_thread(_update_last_used, uid)
     full_text = format_result(res.stdout, res.stderr, res.returncode, res.truncated)
     if len(full_text) <= 1900:
         await inter.followup.send(f"```\n{full_text}\n```")
@@ -367,6 +495,25 @@ class PagedList(View):
         await interaction.response.edit_message(content=f"```\n{self.render()}\n```", view=self)
 
 
+def _list_dir(cur: Path) -> list[str]:
+    # DirEntry caches the type from readdir, so only files need a stat
+    with os.scandir(cur) as it:
+        items = []
+        for e in it:
+            is_dir = e.is_dir(follow_symlinks=False)
+            items.append((e.name, is_dir, 0 if is_dir else e.stat(follow_symlinks=False).st_size))
+    items.sort(key=lambda t: (not t[1], t[0].lower()))
+    return [f"{name}/" if is_dir else f"{name} ({size} B)" for name, is_dir, size in items]
+
+
+def _look(user_id: int) -> list[str]:
+    cwd_rel = _get_cwd(user_id)
+    cur = (_user_dir(user_id) / cwd_rel).resolve()
+    lines = [f"cwd: /{cwd_rel if cwd_rel != '.' else ''}"] + _list_dir(cur)
+    _update_last_used(user_id)
+    return lines
+
+
 @il.subcommand(name="look", description="Change/list current directory in your sandbox.")
 async def il_look(
     inter: nextcord.Interaction,
@@ -374,24 +521,15 @@ async def il_look(
 ):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox found or it expired. Use /il create first.")
         return
     if path:
-        if not _set_cwd(uid, path):
+        if not await asyncio.to_thread(_set_cwd, uid, path):
             await inter.followup.send("Invalid path. Stay in current directory.")
             return
-    base = _user_dir(uid)
-    cwd_rel = _get_cwd(uid)
-    cur = (base / cwd_rel).resolve()
-    entries = []
-    for p in sorted(cur.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())):
-        kind = "/" if p.is_dir() else ""
-        size = "" if p.is_dir() else f" ({p.stat().st_size} B)"
-        entries.append(f"{p.name}{kind}{size}")
-    lines = [f"cwd: /{cwd_rel if cwd_rel != '.' else ''}"] + entries
+    lines = await asyncio.to_thread(_look, uid)
     view = PagedList(lines, page_size=20)
-    _update_last_used(uid)
     await inter.followup.send(content=f"```\n{view.render()}\n```", view=view)
 
 
@@ -399,16 +537,30 @@ async def il_look(
 async def il_delete(inter: nextcord.Interaction):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox to delete.")
         return
-    ok = _delete_sandbox(uid)
+    await _release_container(uid)
+    ok = await asyncio.to_thread(_delete_sandbox, uid)
     if ok:
         await inter.followup.send("Sandbox deleted.")
     else:
         await inter.followup.send("Failed to delete sandbox. Try again.")
 
 
+def _write_file(user_id: int, name: str, content: str) -> str:
+    """Write `name` in the user's cwd and return the reply for /il write."""
+    p = _resolve_path(user_id, name)
+    if not p:
+        return "Invalid path."
+    if p.exists() and p.is_dir():
+        return "A directory exists with that name."
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(content, encoding="utf-8")
+    _update_last_used(user_id)
+    return f"Wrote {p.name} ({len(content)} bytes)."
+
+
 @il.subcommand(name="write", description="Create/overwrite a file in current directory.")
 async def il_write(
     inter: nextcord.Interaction,
@@ -417,21 +569,28 @@ async def il_write(
 ):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox found or it expired. Use /il create first.")
         return
-    p = _resolve_path(uid, name)
-    if not p:
-        await inter.followup.send("Invalid path.")
-        return
-    if p.exists() and p.is_dir():
-        await inter.followup.send("A directory exists with that name.")
-        return
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with open(p, "w", encoding="utf-8") as f:
-        f.write(content)
-    _update_last_used(uid)
-    await inter.followup.send(f"Wrote {p.name} ({len(content)} bytes).")
+    await inter.followup.send(await asyncio.to_thread(_write_file, uid, name, content))
+
+
+def _remove_path(user_id: int, name: str, recursive: bool) -> str:
+    """Remove `name` from the user's cwd and return the reply for /il rm."""
+    p = _resolve_path(user_id, name)
+    if not p or not p.exists():
+        return "Path not found."
+    try:
+        if p.is_dir():
+            if not recursive:
+                return "Use recursive=true to remove directories."
+            shutil.rmtree(p)
+        else:
+            p.unlink(missing_ok=True)
+    except Exception as e:
+        return f"Failed to remove: {e}"
+    _update_last_used(user_id)
+    return "Removed."
 
 
 @il.subcommand(name="rm", description="Delete a file in current directory.")
@@ -442,32 +601,10 @@ async def il_rm(
 ):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox found or it expired. Use /il create first.")
         return
-    p = _resolve_path(uid, name)
-    if not p or not p.exists():
-        await inter.followup.send("Path not found.")
-        return
-    try:
-        if p.is_dir():
-            if not recursive:
-                await inter.followup.send("Use recursive=true to remove directories.")
-                return
-            for q in sorted(p.rglob("*"), reverse=True):
-                if q.is_file() or q.is_symlink():
-                    q.unlink(missing_ok=True)
-            for q in sorted(p.rglob("*"), reverse=True):
-                if q.is_dir():
-                    q.rmdir()
-            p.rmdir()
-        else:
-            p.unlink(missing_ok=True)
-    except Exception as e:
-        await inter.followup.send(f"Failed to remove: {e}")
-        return
-    _update_last_used(uid)
-    await inter.followup.send("Removed.")
+    await inter.followup.send(await asyncio.to_thread(_remove_path, uid, name, recursive))
 
 
 @il.subcommand(name="pip", description="Install Python packages into your sandbox.")
@@ -477,7 +614,7 @@ async def il_pip(
 ):
     await inter.response.defer(ephemeral=True)
     uid = inter.user.id
-    if not _ensure_sandbox(uid):
+    if not await asyncio.to_thread(_ensure_sandbox, uid):
         await inter.followup.send("No sandbox found or it expired. Use /il create first.")
         return
     pkgs = [p for p in packages.split() if p.strip()]
@@ -487,7 +624,7 @@ async def il_pip(
     # Ensure image available if configured to do so at runtime
     try:
         if not PULL_ON_STARTUP:
-            ensure_image(SANDBOX_IMAGE, pull=True)
+            await asyncio.to_thread(ensure_image, SANDBOX_IMAGE, pull=True)
     except SandboxError as e:
         await inter.followup.send(f"Sandbox error: {e}")
         return
@@ -506,38 +643,50 @@ async def il_pip(
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.STDOUT,
     )
-    log_chunks: list[str] = []
-    last_edit = asyncio.get_event_loop().time()
+    # Only the last 1800 characters are ever displayed, so that is all we keep
+    log_tail = ""
     msg = await inter.followup.send("Starting pip install...")
+    # Set by the reader when new output arrived since the last edit
+    changed = False
 
-    async def maybe_edit(final: bool = False):
-        nonlocal last_edit
-        now = asyncio.get_event_loop().time()
-        if not final and (now - last_edit) < 3.0:
-            return
-        text = "".join(log_chunks)
-        # Show only the tail if too long
-        display = text[-1800:]
+    async def show_log():
         try:
-            await msg.edit(content=f"```\n{display}\n```")
+            await msg.edit(content=f"```\n{log_tail}\n```")
         except Exception:
             pass
-        last_edit = now
 
-    try:
+    async def reader():
+        nonlocal changed, log_tail
+        # Drain the pipe in large chunks; edits happen on their own schedule.
+        # The incremental decoder keeps multi-byte characters split across
+        # chunk boundaries intact.
+        if proc.stdout is None:
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while chunk := await proc.stdout.read(16384):
+            log_tail = (log_tail + decoder.decode(chunk))[-1800:]
+            changed = True
+        log_tail = (log_tail + decoder.decode(b"", final=True))[-1800:]
+
+    async def edit_loop():
+        nonlocal changed
         while True:
-            if proc.stdout is None:
-                break
-            line = await proc.stdout.readline()
-            if not line:
-                break
-            log_chunks.append(line.decode("utf-8", errors="replace"))
-            await maybe_edit()
+            await asyncio.sleep(3.0)
+            # Skip identical edits during silent stretches (e.g. big downloads)
+            if changed:
+                changed = False
+                await show_log()
+
+    reader_task = asyncio.create_task(reader())
+    edit_task = asyncio.create_task(edit_loop())
+    try:
+        await reader_task
     finally:
+        reader_task.cancel()
+        edit_task.cancel()
         rc = await proc.wait()
-        await maybe_edit(final=True)
-        full_log = "".join(log_chunks)
-        _update_last_used(uid)
+        await show_log()
+        await asyncio.to_thread(_update_last_used, uid)
 
 
 
@@ -545,7 +694,7 @@ async def il_pip(
 async def health_cmd(inter: nextcord.Interaction):
     await inter.response.defer(ephemeral=True)
     try:
-        ensure_image(SANDBOX_IMAGE, pull=False)
+        await asyncio.to_thread(ensure_image, SANDBOX_IMAGE, pull=False)
         msg = f"Docker reachable. Image present: {SANDBOX_IMAGE}"
     except SandboxError as e:
         msg = f"Sandbox not ready: {e}"
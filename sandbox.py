@@ -1,7 +1,9 @@
+import asyncio
+import codecs
 import os
 import shutil
 import subprocess
-import uuid
+import time
 from dataclasses import dataclass
 from typing import Optional, Dict
 
@@ -19,12 +21,37 @@ class SandboxError(Exception):
     pass
 
 
+class ContainerNotRunning(SandboxError):
+    """The persistent container targeted by `docker exec` is gone."""
+
+
+# Label attached to long-lived per-user containers so they can be found later
+SANDBOX_LABEL = "inline.sandbox=1"
+
+
+# Resolved docker binary and image -> time it was last seen locally. Both are
+# dropped whenever a SandboxError suggests the environment changed.
+_DOCKER_BIN: Optional[str] = None
+_IMAGE_PRESENT: Dict[str, float] = {}
+_IMAGE_PRESENT_TTL = 60.0
+
+
+def _invalidate_docker_cache() -> None:
+    global _DOCKER_BIN
+    _DOCKER_BIN = None
+    _IMAGE_PRESENT.clear()
+
+
 def _ensure_docker() -> str:
+    global _DOCKER_BIN
+    if _DOCKER_BIN is not None:
+        return _DOCKER_BIN
     docker_bin = os.environ.get("DOCKER_BINARY", "docker")
     if not shutil.which(docker_bin):
         raise SandboxError(
             f"Docker binary '{docker_bin}' not found. Install Docker and ensure it's on PATH." 
         )
+    _DOCKER_BIN = docker_bin
     return docker_bin
 
 
@@ -32,7 +59,19 @@ def ensure_image(image: str, *, pull: bool = True, pull_timeout: int = 300) -> N
     """Ensure the Docker image exists locally; optionally pull it.
 
     Raises SandboxError if the image is missing and cannot be pulled or inspected.
+    A successful check is cached for a short while.
     """
+    if _IMAGE_PRESENT.get(image, 0.0) > time.monotonic() - _IMAGE_PRESENT_TTL:
+        return
+    try:
+        _ensure_image(image, pull=pull, pull_timeout=pull_timeout)
+    except SandboxError:
+        _invalidate_docker_cache()
+        raise
+    _IMAGE_PRESENT[image] = time.monotonic()
+
+
+def _ensure_image(image: str, *, pull: bool, pull_timeout: int) -> None:
     docker_bin = _ensure_docker()
     try:
         inspected = subprocess.run(
@@ -69,6 +108,254 @@ def ensure_image(image: str, *, pull: bool = True, pull_timeout: int = 300) -> N
         )
         
 
+# Security flags shared by every sandbox container, independent of the call
+_STATIC_RUN_ARGS = (
+    "run",
+    "--rm",
+    "--network",
+    "none",
+    "--read-only",
+    "--tmpfs",
+    "/tmp:rw,noexec,nosuid,size=64m",
+    "--pids-limit",
+    "64",
+    "--cap-drop",
+    "ALL",
+    "--security-opt",
+    "no-new-privileges",
+    "--user",
+    "1000:1000",
+    "-e",
+    "PYTHONDONTWRITEBYTECODE=1",
+    "-e",
+    "PYTHONUNBUFFERED=1",
+)
+
+
+# PID 1 of a long-lived container: idles and reaps orphans, including the
+# processes killed by _KILL_LEFTOVERS after each run
+_IDLE_INIT = (
+    "import os, time\n"
+    "while True:\n"
+    "    try:\n"
+    "        os.wait()\n"
+    "    except ChildProcessError:\n"
+    "        time.sleep(1)\n"
+)
+# kill(-1) reaches every process in the container except PID 1 and the caller
+_KILL_LEFTOVERS = (
+    "import contextlib, os, signal\n"
+    "with contextlib.suppress(OSError):\n"
+    "    os.kill(-1, signal.SIGKILL)\n"
+)
+
+
+def _build_run_command(
+    docker_bin: str,
+    container_name: str,
+    *,
+    memory: str,
+    cpus: str,
+    image: str,
+    mount_dir: Optional[str],
+    workdir_subpath: Optional[str],
+    env: Optional[Dict[str, str]],
+    detach: bool = False,
+) -> list[str]:
+    # Build Docker run command. We pipe code to `python -` via stdin, or, when
+    # detached, start an idle container that later receives code via `docker exec`.
+    if detach:
+        mode = ("-d", "--label", SANDBOX_LABEL)
+    else:
+        mode = ("-i",)  # keep STDIN open to pass code to python -
+    cmd = [
+        docker_bin,
+        *_STATIC_RUN_ARGS,
+        *mode,
+        "--name",
+        container_name,
+        "--cpus",
+        str(cpus),
+        "--memory",
+        str(memory),
+    ]
+
+    # Optional mount of persistent workspace
+    if mount_dir:
+        # Mount host directory as /workspace read-write
+        cmd += ["-v", f"{mount_dir}:/workspace:rw"]
+        # Set working directory inside container
+        cmd += ["-w", _workdir(workdir_subpath)]
+
+    # Extra env vars
+    if env:
+        for k, v in env.items():
+            cmd += ["-e", f"{k}={v}"]
+
+    if detach:
+        cmd += [image, "python", "-c", _IDLE_INIT]
+    else:
+        cmd += [image, "python", "-"]
+    return cmd
+
+
+def _workdir(workdir_subpath: Optional[str]) -> str:
+    wd = "/workspace"
+    if workdir_subpath:
+        # Normalize possible leading slashes
+        sub = workdir_subpath.lstrip("/")
+        if sub:
+            wd = f"/workspace/{sub}"
+    return wd
+
+
+def _build_exec_command(
+    docker_bin: str,
+    container_name: str,
+    *,
+    workdir_subpath: Optional[str],
+    env: Optional[Dict[str, str]],
+) -> list[str]:
+    cmd = [docker_bin, "exec", "-i", "-w", _workdir(workdir_subpath)]
+    if env:
+        for k, v in env.items():
+            cmd += ["-e", f"{k}={v}"]
+    cmd += [container_name, "python", "-"]
+    return cmd
+
+
+async def _kill_leftovers(docker_bin: str, container_name: str) -> None:
+    # A run must not outlive its timeout through background processes it
+    # started; if they cannot be killed, drop the whole container instead.
+    try:
+        killer = await asyncio.create_subprocess_exec(
+            docker_bin,
+            "exec",
+            container_name,
+            "python",
+            "-c",
+            _KILL_LEFTOVERS,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        rc = await asyncio.wait_for(killer.wait(), timeout=10)
+    except Exception:
+        rc = None
+    if rc != 0:
+        await _force_remove_container(docker_bin, container_name)
+
+
+async def _container_running(docker_bin: str, container_name: str) -> bool:
+    try:
+        inspected = await asyncio.create_subprocess_exec(
+            docker_bin,
+            "inspect",
+            "-f",
+            "{{.State.Running}}",
+            container_name,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await inspected.communicate()
+    except Exception:
+        return False
+    return inspected.returncode == 0 and out.strip() == b"true"
+
+
+async def _exec_target_gone(docker_bin: str, container_name: str, returncode: int, stdout: str, stderr: str) -> bool:
+    # Only treat a failure as "container gone" when the docker CLI itself
+    # reported an error *and* docker confirms the container is not running.
+    # User code can print anything to stderr, so the text alone proves nothing.
+    if returncode == 0 or stdout:
+        return False
+    if not stderr.startswith(("Error response from daemon:", "Error: No such container:")):
+        return False
+    return not await _container_running(docker_bin, container_name)
+
+
+def start_sandbox_container(
+    container_name: str,
+    *,
+    mount_dir: str,
+    memory: str = "256m",
+    cpus: str = "1.0",
+    image: str = "python:3.11-alpine",
+) -> str:
+    """Start a long-lived idle sandbox container and return its id.
+
+    The container has the same limits as a one-shot run and is meant to be
+    used with `run_code_in_docker_async(..., container_name=...)`. If a
+    container with this name is already running it is reused.
+    """
+    docker_bin = _ensure_docker()
+    try:
+        inspected = subprocess.run(
+            [docker_bin, "inspect", "-f", "{{.State.Running}} {{.Id}}", container_name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+        if inspected.returncode == 0:
+            running, _, cid = inspected.stdout.decode().strip().partition(" ")
+            if running == "true":
+                return cid
+            remove_container(container_name)
+        cmd = _build_run_command(
+            docker_bin,
+            container_name,
+            memory=memory,
+            cpus=cpus,
+            image=image,
+            mount_dir=mount_dir,
+            workdir_subpath=None,
+            env=None,
+            detach=True,
+        )
+        started = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+    except Exception as e:
+        raise SandboxError(f"Failed to start sandbox container: {e}") from e
+    if started.returncode != 0:
+        detail = started.stderr.decode("utf-8", errors="replace").strip()
+        raise SandboxError(f"Failed to start sandbox container: {detail}")
+    return started.stdout.decode().strip()
+
+
+def remove_container(container_name: str) -> None:
+    """Force-remove a container, ignoring errors (e.g. if it is already gone)."""
+    try:
+        docker_bin = _ensure_docker()
+        subprocess.run(
+            [docker_bin, "rm", "-f", container_name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+    except Exception:
+        pass
+
+
+def remove_labelled_containers() -> None:
+    """Remove sandbox containers left over from a previous bot process."""
+    try:
+        docker_bin = _ensure_docker()
+        listed = subprocess.run(
+            [docker_bin, "ps", "-aq", "--filter", f"label={SANDBOX_LABEL}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+        ids = listed.stdout.decode().split()
+        if ids:
+            subprocess.run(
+                [docker_bin, "rm", "-f", *ids],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=60,
+            )
+    except Exception:
+        pass
+
+
 def run_code_in_docker(
     code: str,
     *,
@@ -99,73 +386,34 @@ def run_code_in_docker(
     if ensure_image_present:
         ensure_image(image, pull=True)
 
-    container_name = f"py-sbx-{uuid.uuid4().hex[:12]}"
-
-    # Build Docker run command. We pipe code to `python -` via stdin.
-    cmd = [
+    container_name = f"py-sbx-{os.urandom(6).hex()}"
+    cmd = _build_run_command(
         docker_bin,
-        "run",
-        "--rm",
-        "--name",
         container_name,
-        "-i",  # keep STDIN open to pass code to python -
-        "--network",
-        "none",
-        "--read-only",
-        "--tmpfs",
-        "/tmp:rw,noexec,nosuid,size=64m",
-        "--pids-limit",
-        "64",
-        "--cpus",
-        str(cpus),
-        "--memory",
-        str(memory),
-        "--cap-drop",
-        "ALL",
-        "--security-opt",
-        "no-new-privileges",
-        "--user",
-        "1000:1000",
-        "-e",
-        "PYTHONDONTWRITEBYTECODE=1",
-        "-e",
-        "PYTHONUNBUFFERED=1",
-    ]
-
-    # Optional mount of persistent workspace
-    if mount_dir:
-        # Mount host directory as /workspace read-write
-        cmd += ["-v", f"{mount_dir}:/workspace:rw"]
-        # Set working directory inside container
-        wd = "/workspace"
-        if workdir_subpath:
-            # Normalize possible leading slashes
-            sub = workdir_subpath.lstrip("/")
-            if sub:
-                wd = f"/workspace/{sub}"
-        cmd += ["-w", wd]
-
-    # Extra env vars
-    if env:
-        for k, v in env.items():
-            cmd += ["-e", f"{k}={v}"]
-
-    cmd += [
-        image,
-        "python",
-        "-",
-    ]
+        memory=memory,
+        cpus=cpus,
+        image=image,
+        mount_dir=mount_dir,
+        workdir_subpath=workdir_subpath,
+        env=env,
+    )
 
+    code_bytes = code.encode("utf-8", errors="replace")
     try:
-        proc = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            input=code.encode("utf-8", errors="replace"),
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            timeout=timeout_seconds,
         )
-        out = proc.stdout
-        err = proc.stderr
+        # communicate() writes stdin from a memoryview of code_bytes and keeps
+        # the timeout covering the write, unlike a bare proc.stdin.write()
+        try:
+            out, err = proc.communicate(input=code_bytes, timeout=timeout_seconds)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
         truncated = False
         if len(out) > max_output_bytes:
             out = out[:max_output_bytes]
@@ -197,11 +445,167 @@ def run_code_in_docker(
             truncated=False,
         )
     except FileNotFoundError as e:
+        _invalidate_docker_cache()
         raise SandboxError("Docker not found. Is Docker installed and running?") from e
     except Exception as e:
         raise SandboxError(f"Failed to execute code in Docker: {e}") from e
 
 
+async def _force_remove_container(docker_bin: str, container_name: str) -> None:
+    try:
+        rm = await asyncio.create_subprocess_exec(
+            docker_bin,
+            "rm",
+            "-f",
+            container_name,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        await rm.wait()
+    except Exception:
+        pass
+
+
+async def run_code_in_docker_async(
+    code: str,
+    *,
+    timeout_seconds: float = 5.0,
+    memory: str = "256m",
+    cpus: str = "1.0",
+    image: str = "python:3.11-alpine",
+    max_output_bytes: int = 100_000,
+    ensure_image_present: bool = False,
+    mount_dir: Optional[str] = None,
+    workdir_subpath: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    container_name: Optional[str] = None,
+) -> SandboxResult:
+    """Async variant of `run_code_in_docker` that never blocks the event loop.
+
+    stdout/stderr are decoded as they arrive; once either stream exceeds
+    `max_output_bytes` (counted in decoded characters) the container is
+    killed and the result is marked truncated, so memory use stays bounded
+    by the limit.
+
+    If `container_name` names a container started with
+    `start_sandbox_container`, the code runs there via `docker exec` instead
+    of in a fresh container; `memory`, `cpus`, `image` and `mount_dir` are
+    then fixed by that container. Processes left behind by the code are
+    killed after the run; on timeout or truncation the container is removed.
+    Raises ContainerNotRunning if the container is gone.
+    """
+    docker_bin = _ensure_docker()
+    if ensure_image_present:
+        await asyncio.to_thread(ensure_image, image, pull=True)
+
+    persistent = container_name is not None
+    if persistent:
+        cmd = _build_exec_command(
+            docker_bin,
+            container_name,
+            workdir_subpath=workdir_subpath,
+            env=env,
+        )
+    else:
+        container_name = f"py-sbx-{os.urandom(6).hex()}"
+        cmd = _build_run_command(
+            docker_bin,
+            container_name,
+            memory=memory,
+            cpus=cpus,
+            image=image,
+            mount_dir=mount_dir,
+            workdir_subpath=workdir_subpath,
+            env=env,
+        )
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError as e:
+        _invalidate_docker_cache()
+        raise SandboxError("Docker not found. Is Docker installed and running?") from e
+    except Exception as e:
+        raise SandboxError(f"Failed to execute code in Docker: {e}") from e
+
+    truncated = False
+
+    async def drain(stream: asyncio.StreamReader) -> str:
+        # Decode while reading so the result needs no second bytes -> str pass
+        nonlocal truncated
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parts: list[str] = []
+        size = 0
+        while True:
+            chunk = await stream.read(8192)
+            if not chunk:
+                parts.append(decoder.decode(b"", final=True))
+                return "".join(parts)
+            text = decoder.decode(chunk)
+            room = max_output_bytes - size
+            if len(text) > room:
+                parts.append(text[:room])
+                truncated = True
+                # Stop the run instead of buffering output we will discard
+                if proc.returncode is None:
+                    proc.kill()
+                await _force_remove_container(docker_bin, container_name)
+                return "".join(parts)
+            parts.append(text)
+            size += len(text)
+
+    async def feed() -> None:
+        try:
+            proc.stdin.write(code.encode("utf-8", errors="replace"))
+            await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            proc.stdin.close()
+
+    try:
+        _, out, err, _ = await asyncio.wait_for(
+            asyncio.gather(feed(), drain(proc.stdout), drain(proc.stderr), proc.wait()),
+            timeout=timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        if proc.returncode is None:
+            proc.kill()
+        await _force_remove_container(docker_bin, container_name)
+        await proc.wait()
+        return SandboxResult(
+            returncode=124,
+            stdout="",
+            stderr=(
+                "Execution timed out. If this was the first run, the Docker image"
+                " may still be pulling. Try pre-pulling or increasing the timeout."
+            ),
+            timed_out=True,
+            truncated=False,
+        )
+    except Exception as e:
+        if proc.returncode is None:
+            proc.kill()
+        raise SandboxError(f"Failed to execute code in Docker: {e}") from e
+
+    if persistent:
+        if await _exec_target_gone(docker_bin, container_name, proc.returncode, out, err):
+            raise ContainerNotRunning(f"Sandbox container '{container_name}' is not running.")
+        if not truncated:
+            await _kill_leftovers(docker_bin, container_name)
+    return SandboxResult(
+        returncode=proc.returncode,
+        stdout=out,
+        stderr=err,
+        timed_out=False,
+        truncated=truncated,
+    )
+
+
 def build_pip_install_command(
     *,
     mount_dir: str,
@@ -215,7 +619,7 @@ def build_pip_install_command(
     Network is allowed for this command. The workspace is mounted at /workspace.
     """
     docker_bin = _ensure_docker()
-    container_name = f"py-pip-{uuid.uuid4().hex[:12]}"
+    container_name = f"py-pip-{os.urandom(6).hex()}"
     cmd = [
         docker_bin,
         "run",